@@ -1,5 +1,6 @@
-from typing import List, Optional
-from storage import StorageManager
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from search import QGramIndex, SubstringColumn
+from storage import BaseStorageManager, create_storage_manager
 
 
 class Book:
@@ -13,6 +14,8 @@ class Book:
         available (bool): Whether the book is available for checkout.
     """
 
+    __slots__ = ("_title", "_author", "_title_lc", "_author_lc", "isbn", "available")
+
     def __init__(
         self, title: str, author: str, isbn: str, available: bool = True
     ) -> None:
@@ -27,7 +30,32 @@ class Book:
         self.title = title
         self.author = author
         self.isbn = isbn
-        self.available = available
+        self.available = bool(available)
+
+    @property
+    def title(self) -> str:
+        """
+        The title of the book.
+        """
+        return self._title
+
+    @title.setter
+    def title(self, title: str) -> None:
+        # Searches compare against the lowercase form, so compute it once here
+        self._title = title
+        self._title_lc = title.lower()
+
+    @property
+    def author(self) -> str:
+        """
+        The author of the book.
+        """
+        return self._author
+
+    @author.setter
+    def author(self, author: str) -> None:
+        self._author = author
+        self._author_lc = author.lower()
 
     def __str__(self) -> str:
         """
@@ -38,26 +66,53 @@ class Book:
         """
         return f"Title: {self.title}, Author: {self.author}, ISBN: {self.isbn}, Status: {'Available' if self.available else 'Checked Out'}"
 
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Dictionary representation of the Book object, used for storage.
+
+        Returns:
+            Dict[str, Any]: The book's attributes keyed by name.
+        """
+        return {
+            "title": self.title,
+            "author": self.author,
+            "isbn": self.isbn,
+            "available": self.available,
+        }
+
 
 class BookManager:
     """
     Manages a collection of books.
 
     Attributes:
-        storage_manager (StorageManager): Instance of StorageManager to handle book data storage.
+        storage_manager (BaseStorageManager): Instance of a storage backend to handle book data storage.
         books (List[Book]): List of books managed by the BookManager.
     """
 
     def __init__(self, file_path: str = "books.json") -> None:
         """
-        Initializes the BookManager with a StorageManager instance and loads existing books.
+        Initializes the BookManager with a storage backend and loads existing books.
 
         Parameters:
-            file_path (str): The path to the JSON file containing book data.
+            file_path (str): The path to the JSON file containing book data, or to
+                             an SQLite database (.db, .sqlite, .sqlite3).
                              Defaults to 'books.json'.
         """
-        self.storage_manager = StorageManager[Book](file_path)
+        self.storage_manager: BaseStorageManager[Book] = create_storage_manager(
+            file_path, table="books", key="isbn", intern_fields=("author",)
+        )
         self.books = self.storage_manager.load_data(Book)
+        self._by_isbn: Dict[str, Book] = {book.isbn: book for book in self.books}
+        # Position of each book in self.books, for O(1) removal
+        self._index_by_isbn: Dict[str, int] = {
+            book.isbn: index for index, book in enumerate(self.books)
+        }
+        self._search_index = QGramIndex[Book]()
+        for book in self.books:
+            self._search_index.add(book, book.title, book.author, book.isbn)
+        # Searchable fields of every book, rebuilt lazily after mutations
+        self._search_columns: Optional[Tuple[SubstringColumn, ...]] = None
 
     @property
     def all_books(self) -> List[Book]:
@@ -81,14 +136,34 @@ class BookManager:
         Returns:
             bool: True if book was successfully added, False if ISBN already exists.
         """
-        if any(book.isbn == isbn for book in self.books):
+        if isbn in self._by_isbn:
             return False  # ISBN already exists
 
         new_book = Book(title, author, isbn)
+        self._index_by_isbn[isbn] = len(self.books)
         self.books.append(new_book)
-        self.storage_manager.save_data(self.books)
+        self._by_isbn[isbn] = new_book
+        self._search_index.add(new_book, title, author, isbn)
+        self._search_columns = None
+        self.storage_manager.append_record("add", new_book)
         return True
 
+    def bulk_add(self, books: Iterable[Tuple[str, str, str]]) -> int:
+        """
+        Adds many books at once, writing them to the storage file in a single batch.
+
+        Parameters:
+            books (Iterable[Tuple[str, str, str]]): (title, author, isbn) of each new book.
+
+        Returns:
+            int: The number of books added. Books whose ISBN already exists are skipped.
+        """
+        added = 0
+        with self.storage_manager:
+            for title, author, isbn in books:
+                added += self.add_book(title, author, isbn)
+        return added
+
     def delete_book(self, isbn: str) -> bool:
         """
         Deletes a book identified by its ISBN.
@@ -99,16 +174,24 @@ class BookManager:
         Returns:
             bool: True if book was successfully deleted, False otherwise.
         """
-        book_to_delete = next((book for book in self.books if book.isbn == isbn), None)
+        book_to_delete = self._by_isbn.pop(isbn, None)
         if book_to_delete:
-            self.books.remove(book_to_delete)
-            self.storage_manager.save_data(self.books)
+            # Move the last book into the freed slot instead of shifting the list
+            index = self._index_by_isbn.pop(isbn)
+            last_book = self.books.pop()
+            if index < len(self.books):
+                self.books[index] = last_book
+                self._index_by_isbn[last_book.isbn] = index
+            self._search_index.discard(book_to_delete)
+            self._search_columns = None
+            self.storage_manager.append_record("del", book_to_delete)
+            self.storage_manager.compact(self.books)
             return True
         return False
 
     def update_book(
         self,
-        isbn: str,
+        isbn_or_book: Union[str, Book],
         new_title: Optional[str] = None,
         new_author: Optional[str] = None,
         new_isbn: Optional[str] = None,
@@ -117,7 +200,9 @@ class BookManager:
         Updates the attributes of a book identified by its ISBN. Ensures that the new ISBN is unique.
 
         Parameters:
-            isbn (str): ISBN of the book to update.
+            isbn_or_book (Union[str, Book]): ISBN of the book to update, or the book
+                                             itself if the caller has already
+                                             looked it up.
             new_title (Optional[str]): New title for the book.
             new_author (Optional[str]): New author for the book.
             new_isbn (Optional[str]): New ISBN for the book.
@@ -125,30 +210,57 @@ class BookManager:
         Returns:
             bool: True if the book was successfully updated, False otherwise.
         """
-        book_to_update = next((book for book in self.books if book.isbn == isbn), None)
+        if isinstance(isbn_or_book, Book):
+            isbn = isbn_or_book.isbn
+            # A deleted or stale book is no longer the one stored under its ISBN
+            if self._by_isbn.get(isbn) is not isbn_or_book:
+                return False
+        else:
+            isbn = isbn_or_book
+        book_to_update = self._by_isbn.get(isbn)
         if book_to_update:
             # Check if new ISBN already exists in other books
-            if new_isbn and any(
-                book.isbn == new_isbn for book in self.books if book != book_to_update
-            ):
+            if new_isbn and new_isbn != isbn and new_isbn in self._by_isbn:
                 return False  # New ISBN already exists
 
             if new_title:
                 book_to_update.title = new_title
             if new_author:
                 book_to_update.author = new_author
-            if new_isbn:
+            if new_isbn and new_isbn != isbn:
+                del self._by_isbn[isbn]
                 book_to_update.isbn = new_isbn
-
-            self.storage_manager.save_data(self.books)
+                self._by_isbn[new_isbn] = book_to_update
+                self._index_by_isbn[new_isbn] = self._index_by_isbn.pop(isbn)
+
+            self._search_index.discard(book_to_update)
+            self._search_index.add(
+                book_to_update,
+                book_to_update.title,
+                book_to_update.author,
+                book_to_update.isbn,
+            )
+            self._search_columns = None
+            self.storage_manager.append_record("add", book_to_update, key=isbn)
+            self.storage_manager.compact(self.books)
             return True
         return False
 
-    def save_books(self) -> None:
+    def save_book(self, book: Book) -> None:
         """
-        Saves the current list of books to the storage file.
+        Records the current state of a single book in the storage file.
+
+        Parameters:
+            book (Book): The book whose changes should be saved.
         """
-        self.storage_manager.save_data(self.books)
+        self.storage_manager.append_record("add", book)
+        self.storage_manager.compact(self.books)
+
+    def close(self) -> None:
+        """
+        Releases the storage file or database connection.
+        """
+        self.storage_manager.close()
 
     def find_book_by_isbn(self, isbn: str):
         """
@@ -160,7 +272,7 @@ class BookManager:
         Returns:
             Book: The book with the given ISBN, or None if not found.
         """
-        return next((book for book in self.books if book.isbn == isbn), None)
+        return self._by_isbn.get(isbn)
 
     def find_book(
         self,
@@ -175,13 +287,46 @@ class BookManager:
         Returns:
             List[Book]: List of books that match the search term.
         """
+        # Short terms cannot be narrowed by the index and fall back to a full scan
+        candidates = self._search_index.candidates(search_term)
+        if candidates is None:
+            return self._scan_books(search_term)
+
         found_books = []
         search_term_lower = search_term.lower()
-        for book in self.books:
+        for book in candidates:
             if (
-                search_term_lower in book.title.lower()
-                or search_term_lower in book.author.lower()
+                search_term_lower in book._title_lc
+                or search_term_lower in book._author_lc
                 or search_term in book.isbn
             ):
                 found_books.append(book)
+        # Postings follow insertion order, so restore the list order
+        found_books.sort(key=lambda book: self._index_by_isbn[book.isbn])
         return found_books
+
+    def _scan_books(self, search_term: str) -> List[Book]:
+        """
+        Finds books that match the search term by searching columns that pack the
+        lowercase titles, lowercase authors and ISBNs of all books into one
+        buffer each, so the scan happens in C instead of a Python loop.
+
+        Parameters:
+            search_term (str): The term to search for in the book's title, author, or ISBN.
+
+        Returns:
+            List[Book]: List of books that match the search term.
+        """
+        if self._search_columns is None:
+            self._search_columns = (
+                SubstringColumn(book._title_lc for book in self.books),
+                SubstringColumn(book._author_lc for book in self.books),
+                SubstringColumn(book.isbn for book in self.books),
+            )
+
+        titles, authors, isbns = self._search_columns
+        search_term_lower = search_term.lower()
+        found_indexes = set(titles.find(search_term_lower))
+        found_indexes.update(authors.find(search_term_lower))
+        found_indexes.update(isbns.find(search_term))
+        return [self.books[index] for index in sorted(found_indexes)]
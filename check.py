@@ -1,6 +1,6 @@
-from typing import List
+from typing import Dict, List
 from book import BookManager
-from storage import StorageManager
+from storage import BaseStorageManager, create_storage_manager
 
 
 class CheckoutRecord:
@@ -12,10 +12,15 @@ class CheckoutRecord:
         isbn (str): The ISBN of the book that is checked out.
     """
 
+    __slots__ = ("user_id", "isbn")
+
     def __init__(self, user_id: str, isbn: str) -> None:
         self.user_id = user_id
         self.isbn = isbn
 
+    def to_dict(self) -> Dict[str, str]:
+        return {"user_id": self.user_id, "isbn": self.isbn}
+
 
 class CheckoutManager:
     """
@@ -26,9 +31,28 @@ class CheckoutManager:
         """
         Initializes the CheckoutManager with a file path for checkout records and a BookManager instance.
         """
-        self.storage_manager = StorageManager[CheckoutRecord](checkout_file)
+        self.storage_manager: BaseStorageManager[CheckoutRecord]
+        self.storage_manager = create_storage_manager(
+            checkout_file,
+            table="checkouts",
+            key="isbn",
+            indexes=("user_id",),
+            intern_fields=("user_id",),
+            references=(("isbn", "books"),),
+        )
         self.checkouts = self.storage_manager.load_data(CheckoutRecord)
         self.book_manager = book_manager
+        self._by_isbn: Dict[str, CheckoutRecord] = {
+            checkout.isbn: checkout for checkout in self.checkouts
+        }
+        # Position of each checkout in self.checkouts, for O(1) removal
+        self._index_by_isbn: Dict[str, int] = {
+            checkout.isbn: index for index, checkout in enumerate(self.checkouts)
+        }
+        # Checkouts of each user keyed by ISBN, in checkout order
+        self._by_user: Dict[str, Dict[str, CheckoutRecord]] = {}
+        for checkout in self.checkouts:
+            self._by_user.setdefault(checkout.user_id, {})[checkout.isbn] = checkout
 
     def checkout_book(self, user_id: str, isbn: str) -> bool:
         """
@@ -41,24 +65,28 @@ class CheckoutManager:
         Returns:
             bool: True if the checkout was successful, False otherwise.
         """
+        # Check if the book exists and is available
+        book = self.book_manager.find_book_by_isbn(isbn)
+        if not book or not book.available:
+            return False
+
         # Check if book is already checked out
-        if any(checkout.isbn == isbn for checkout in self.checkouts):
+        if isbn in self._by_isbn:
             return False
 
         # Check if user has less than 3 books checked out
-        if sum(checkout.user_id == user_id for checkout in self.checkouts) >= 3:
+        if len(self._by_user.get(user_id, ())) >= 3:
             return False
 
-        # Check if the book exists and is available
-        book = self.book_manager.find_book_by_isbn(isbn)
-        if book and book.available:
-            book.available = False
-            self.book_manager.save_books()
-            self.checkouts.append(CheckoutRecord(user_id, isbn))
-            self.storage_manager.save_data(self.checkouts)
-            return True
-
-        return False
+        book.available = False
+        self.book_manager.save_book(book)
+        new_checkout = CheckoutRecord(user_id, isbn)
+        self._index_by_isbn[isbn] = len(self.checkouts)
+        self.checkouts.append(new_checkout)
+        self._by_isbn[isbn] = new_checkout
+        self._by_user.setdefault(user_id, {})[isbn] = new_checkout
+        self.storage_manager.append_record("add", new_checkout)
+        return True
 
     def checkin_book(self, isbn: str) -> bool:
         """
@@ -70,16 +98,33 @@ class CheckoutManager:
         Returns:
             bool: True if the check-in was successful, False otherwise.
         """
-        for checkout in self.checkouts:
-            if checkout.isbn == isbn:
-                self.checkouts.remove(checkout)
-                book = self.book_manager.find_book_by_isbn(isbn)
-                if book:
-                    book.available = True
-                    self.book_manager.save_books()
-                self.storage_manager.save_data(self.checkouts)
-                return True
-        return False
+        checkout = self._by_isbn.pop(isbn, None)
+        if checkout is None:
+            return False
+
+        # Move the last checkout into the freed slot instead of shifting the list
+        index = self._index_by_isbn.pop(isbn)
+        last_checkout = self.checkouts.pop()
+        if index < len(self.checkouts):
+            self.checkouts[index] = last_checkout
+            self._index_by_isbn[last_checkout.isbn] = index
+        user_checkouts = self._by_user[checkout.user_id]
+        del user_checkouts[isbn]
+        if not user_checkouts:
+            del self._by_user[checkout.user_id]
+        book = self.book_manager.find_book_by_isbn(isbn)
+        if book:
+            book.available = True
+            self.book_manager.save_book(book)
+        self.storage_manager.append_record("del", checkout)
+        self.storage_manager.compact(self.checkouts)
+        return True
+
+    def close(self) -> None:
+        """
+        Releases the storage file or database connection.
+        """
+        self.storage_manager.close()
 
     def list_user_checkouts(self, user_id: str) -> List[CheckoutRecord]:
         """
@@ -91,4 +136,8 @@ class CheckoutManager:
         Returns:
             List[CheckoutRecord]: A list of CheckoutRecord for the specified user.
         """
-        return [checkout for checkout in self.checkouts if checkout.user_id == user_id]
+        # Checkout order drifts from the list after a swap removal, so use the list
+        return sorted(
+            self._by_user.get(user_id, {}).values(),
+            key=lambda checkout: self._index_by_isbn[checkout.isbn],
+        )
@@ -1,7 +1,10 @@
-from typing import Callable
+import argparse
+from functools import cached_property
+from typing import Callable, List, Optional
 from book import BookManager
 from user import UserManager
 from check import CheckoutManager
+from storage import SQLITE_EXTENSIONS
 
 
 class LibrarySystemUI:
@@ -11,11 +14,113 @@ class LibrarySystemUI:
 
     """
 
-    def __init__(self) -> None:
-        """Initialize the Library System UI with a BookManager instance."""
-        self.book_manager = BookManager()
-        self.user_manager = UserManager()
-        self.checkout_manager = CheckoutManager("checkouts.json", self.book_manager)
+    _BOOK_MENU_TEXT = """
+        Book Management
+        1. Add Book
+        2. Delete Book
+        3. Update Book
+        4. List Books
+        5. Find Book
+        6. Back to Main Menu
+        7. Exit
+        """
+
+    _USER_MENU_TEXT = """
+        User Management
+        1. Add User
+        2. Delete User
+        3. Update User
+        4. List Users
+        5. Find User
+        6. Back to Main Menu
+        7. Exit
+        """
+
+    _CHECKOUT_MENU_TEXT = """
+        Checkout Management
+        1. Checkout Book
+        2. Checkin Book
+        3. List User Checkouts
+        4. Back to Main Menu
+        5. Exit
+        """
+
+    _MAIN_MENU_TEXT = """
+        Library Management System
+        1. Book Management
+        2. User Management
+        3. Checkout Management
+        4. Exit
+        """
+
+    def __init__(self, database: Optional[str] = None) -> None:
+        """
+        Initialize the Library System UI. Managers are created on first use.
+
+        Parameters:
+            database (Optional[str]): Path to an SQLite database (.db, .sqlite,
+                                      .sqlite3) holding books, users and checkouts.
+                                      Defaults to JSON files in the working
+                                      directory.
+
+        Raises:
+            ValueError: If the database is not an SQLite file. A JSON journal
+                        holds the records of a single manager and cannot be
+                        shared.
+        """
+        if database and not database.endswith(SQLITE_EXTENSIONS):
+            raise ValueError(
+                f"Database must be an SQLite file ({', '.join(SQLITE_EXTENSIONS)})"
+            )
+        self.database = database
+        # Menu dispatch tables are built once rather than on every menu display.
+        # Entry i handles the choice str(i + 1).
+        self._book_menu_options = [
+            self.add_book_ui,
+            self.delete_book_ui,
+            self.update_book_ui,
+            self.display_books,
+            self.find_book_ui,
+            self.main_menu,
+            self.exit_program,
+        ]
+        self._user_menu_options = [
+            self.add_user_ui,
+            self.delete_user_ui,
+            self.update_user_ui,
+            self.display_users,
+            self.find_user_ui,
+            self.main_menu,
+            self.exit_program,
+        ]
+        self._checkout_menu_options = [
+            self.checkout_book_ui,
+            self.checkin_book_ui,
+            self.list_user_checkouts_ui,
+            self.main_menu,
+            self.exit_program,
+        ]
+        self._main_menu_options = [
+            self.book_menu,
+            self.user_menu,
+            self.checkout_menu,
+            self.exit_program,
+        ]
+
+    @cached_property
+    def book_manager(self) -> BookManager:
+        """The BookManager, loading the books on first access."""
+        return BookManager(self.database or "books.json")
+
+    @cached_property
+    def user_manager(self) -> UserManager:
+        """The UserManager, loading the users on first access."""
+        return UserManager(self.database or "users.json")
+
+    @cached_property
+    def checkout_manager(self) -> CheckoutManager:
+        """The CheckoutManager, loading the checkouts on first access."""
+        return CheckoutManager(self.database or "checkouts.json", self.book_manager)
 
     def add_book_ui(self) -> Callable[[], Callable]:
         """Add a new book to the library. Prompt for title, author, and ISBN."""
@@ -66,6 +171,11 @@ class LibrarySystemUI:
             print("Invalid ISBN. ISBN should be numeric.")
             return self.book_menu
 
+        book = self.book_manager.find_book_by_isbn(isbn)
+        if not book:
+            print("Book not found.")
+            return self.book_menu
+
         new_title = input("Enter the new title (press enter to skip): ").strip()
         new_author = input("Enter the new author (press enter to skip): ").strip()
         new_isbn = input("Enter the new ISBN (press enter to skip): ").strip()
@@ -74,10 +184,10 @@ class LibrarySystemUI:
             print("Invalid ISBN. ISBN should be numeric.")
             return self.book_menu
 
-        if self.book_manager.update_book(isbn, new_title, new_author, new_isbn):
+        if self.book_manager.update_book(book, new_title, new_author, new_isbn):
             print("Book updated successfully.")
         else:
-            print("Book not found or update failed due to duplicate ISBN.")
+            print("Update failed due to duplicate ISBN.")
 
         return self.book_menu
 
@@ -115,30 +225,10 @@ class LibrarySystemUI:
 
     def book_menu(self) -> Callable[[], None]:
         """Display the book management submenu."""
-        menu_options = {
-            "1": self.add_book_ui,
-            "2": self.delete_book_ui,
-            "3": self.update_book_ui,
-            "4": self.display_books,
-            "5": self.find_book_ui,
-            "6": self.main_menu,
-            "7": self.exit_program,
-        }
-
-        menu_text = """
-        Book Management
-        1. Add Book
-        2. Delete Book
-        3. Update Book
-        4. List Books
-        5. Find Book
-        6. Back to Main Menu
-        7. Exit
-        """
-        print(menu_text)
+        print(self._BOOK_MENU_TEXT)
         choice = input("Enter choice: ")
 
-        return menu_options.get(choice, self.invalid_choice)
+        return self._dispatch(self._book_menu_options, choice)
 
     def add_user_ui(self) -> Callable[[], Callable]:
         """Add a new user to the system. Prompt for name and user ID."""
@@ -220,30 +310,10 @@ class LibrarySystemUI:
 
     def user_menu(self) -> Callable[[], None]:
         """Display the user management submenu."""
-        menu_options = {
-            "1": self.add_user_ui,
-            "2": self.delete_user_ui,
-            "3": self.update_user_ui,
-            "4": self.display_users,
-            "5": self.find_user_ui,
-            "6": self.main_menu,
-            "7": self.exit_program,
-        }
-
-        menu_text = """
-        User Management
-        1. Add User
-        2. Delete User
-        3. Update User
-        4. List Users
-        5. Find User
-        6. Back to Main Menu
-        7. Exit
-        """
-        print(menu_text)
+        print(self._USER_MENU_TEXT)
         choice = input("Enter choice: ")
 
-        return menu_options.get(choice, self.invalid_choice)
+        return self._dispatch(self._user_menu_options, choice)
 
     def checkout_book_ui(self) -> Callable[[], Callable]:
         """Handle the checkout of a book."""
@@ -286,51 +356,32 @@ class LibrarySystemUI:
 
     def checkout_menu(self) -> Callable[[], None]:
         """Display the checkout management submenu."""
-        menu_options = {
-            "1": self.checkout_book_ui,
-            "2": self.checkin_book_ui,
-            "3": self.list_user_checkouts_ui,
-            "4": self.main_menu,
-            "5": self.exit_program,
-        }
-
-        menu_text = """
-        Checkout Management
-        1. Checkout Book
-        2. Checkin Book
-        3. List User Checkouts
-        4. Back to Main Menu
-        5. Exit
-        """
-        print(menu_text)
+        print(self._CHECKOUT_MENU_TEXT)
         choice = input("Enter choice: ")
 
-        return menu_options.get(choice, self.invalid_choice)
+        return self._dispatch(self._checkout_menu_options, choice)
 
     def main_menu(self) -> Callable[[], None]:
         """Display the main menu and return the function associated with the user's choice."""
-        menu_options = {
-            "1": self.book_menu,
-            "2": self.user_menu,
-            "3": self.checkout_menu,
-            "4": self.exit_program,
-        }
-
-        menu_text = """
-        Library Management System
-        1. Book Management
-        2. User Management
-        3. Checkout Management
-        4. Exit
-        """
-        print(menu_text)
+        print(self._MAIN_MENU_TEXT)
         choice = input("Enter choice: ")
 
-        return menu_options.get(choice, self.invalid_choice)
+        return self._dispatch(self._main_menu_options, choice)
+
+    def _dispatch(self, options: List[Callable], choice: str) -> Callable:
+        """Return the handler for a menu choice, indexing the table by the digit."""
+        index = ord(choice) - ord("1") if len(choice) == 1 else -1
+        if 0 <= index < len(options):
+            return options[index]
+        return self.invalid_choice
 
     def exit_program(self) -> None:
         """Exit the program."""
         print("Exiting.")
+        # Only the managers used in this session have been created
+        for name in ("checkout_manager", "user_manager", "book_manager"):
+            if name in self.__dict__:
+                self.__dict__[name].close()
         exit()
 
     def invalid_choice(self) -> Callable[[], Callable]:
@@ -345,7 +396,18 @@ class LibrarySystemUI:
 
 
 def main():
-    library_system = LibrarySystemUI()
+    parser = argparse.ArgumentParser(description="Library Management System")
+    parser.add_argument(
+        "--database",
+        help="SQLite database (.db, .sqlite, .sqlite3) to use instead of JSON files",
+    )
+    args = parser.parse_args()
+    if args.database and not args.database.endswith(SQLITE_EXTENSIONS):
+        parser.error(
+            f"--database must be an SQLite file ({', '.join(SQLITE_EXTENSIONS)})"
+        )
+
+    library_system = LibrarySystemUI(args.database)
     library_system.run()
 
 
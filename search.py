@@ -0,0 +1,138 @@
+from array import array
+from bisect import bisect_right
+from typing import Dict, Generic, Iterable, Iterator, List, Optional, Set, TypeVar
+
+T = TypeVar("T")
+
+
+class QGramIndex(Generic[T]):
+    """
+    An inverted index from lowercase character q-grams to the items containing them.
+
+    Looking up a search term intersects the postings of its q-grams, which yields
+    every item that could contain the term as a substring. Callers still verify
+    the candidates, since sharing all q-grams does not guarantee a match.
+
+    Attributes:
+        q (int): The length of the indexed character sequences.
+    """
+
+    def __init__(self, q: int = 3) -> None:
+        """
+        Initializes an empty index.
+
+        Parameters:
+            q (int): The length of the indexed character sequences. Defaults to 3.
+        """
+        self.q = q
+        self._postings: Dict[str, Dict[T, None]] = {}
+        self._grams: Dict[T, Set[str]] = {}
+
+    def _split(self, text: str) -> Set[str]:
+        """
+        Splits lowercase text into its distinct q-grams.
+        """
+        return {text[i : i + self.q] for i in range(len(text) - self.q + 1)}
+
+    def add(self, item: T, *fields: str) -> None:
+        """
+        Indexes an item under the q-grams of each of the given fields.
+
+        Parameters:
+            item (T): The item to index.
+            fields (str): The text values the item should be found by.
+        """
+        grams: Set[str] = set()
+        for field in fields:
+            grams |= self._split(field.lower())
+        self._grams[item] = grams
+        for gram in grams:
+            self._postings.setdefault(gram, {})[item] = None
+
+    def discard(self, item: T) -> None:
+        """
+        Removes an item from the index if it is present.
+
+        Parameters:
+            item (T): The item to remove.
+        """
+        for gram in self._grams.pop(item, ()):
+            posting = self._postings[gram]
+            del posting[item]
+            if not posting:
+                del self._postings[gram]
+
+    def candidates(self, search_term: str) -> Optional[List[T]]:
+        """
+        Finds the items that may contain the search term, ignoring case.
+
+        Parameters:
+            search_term (str): The term to look up.
+
+        Returns:
+            Optional[List[T]]: The candidate items, or None if the term is shorter
+                               than q and the index cannot narrow the search.
+        """
+        grams = self._split(search_term.lower())
+        if not grams:
+            return None
+
+        postings = []
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if not posting:
+                return []
+            postings.append(posting)
+
+        postings.sort(key=len)
+        smallest, rest = postings[0], postings[1:]
+        return [item for item in smallest if all(item in posting for posting in rest)]
+
+
+class SubstringColumn:
+    """
+    A column of strings packed into a single newline-separated bytes buffer.
+
+    Searching runs bytes.find over the whole buffer, so the scan happens in
+    CPython's C substring search rather than a Python loop, and the start
+    offset of each value maps a match back to its position in the column.
+    """
+
+    def __init__(self, values: Iterable[str]) -> None:
+        """
+        Packs the values into the column.
+
+        Parameters:
+            values (Iterable[str]): The strings to search, in column order.
+        """
+        encoded = [value.encode() for value in values]
+        self._offsets = array("q")  # Start of each value in the buffer
+        position = 0
+        for value in encoded:
+            self._offsets.append(position)
+            position += len(value) + 1
+        self._buffer = b"".join(value + b"\n" for value in encoded)
+
+    def find(self, term: str) -> Iterator[int]:
+        """
+        Finds the values containing the term.
+
+        Parameters:
+            term (str): The substring to look for. Case-sensitive.
+
+        Returns:
+            Iterator[int]: The positions of the matching values, in ascending order.
+        """
+        needle = term.encode()
+        if b"\n" in needle or not self._offsets:
+            return
+
+        buffer, offsets = self._buffer, self._offsets
+        position = buffer.find(needle)
+        while position != -1:
+            index = bisect_right(offsets, position) - 1
+            yield index
+            if index + 1 == len(offsets):
+                return
+            # Resume at the next value so each value is reported once
+            position = buffer.find(needle, offsets[index + 1])
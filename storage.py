@@ -1,57 +1,679 @@
 import json
-from typing import List, TypeVar, Generic, Type
+import os
+import sqlite3
+import sys
+import weakref
+from typing import (
+    IO,
+    Any,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Generic,
+    Type,
+)
+
+try:
+    import ijson
+except ImportError:  # ijson is optional, fall back to parsing the whole array
+    ijson = None
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the standard json module
+    orjson = None
+
+_IJSON_ERRORS = (ijson.JSONError,) if ijson else ()
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize an object to a single compact JSON line."""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, separators=(",", ":")) + "\n").encode()
+
+
+def _loads(data: bytes) -> Any:
+    """Deserialize a JSON document."""
+    return orjson.loads(data) if orjson else json.loads(data)
+
 
 T = TypeVar("T")
 
 
-class StorageManager(Generic[T]):
+class BaseStorageManager(Generic[T]):
     """
-    Manages the storage of data in a JSON file.
+    The interface shared by the storage backends.
 
-    This class is generic and can be used to manage any type of data.
-    Users must provide a data class (like Book or User) and a file path for storage.
+    Managers load their objects once, then record each mutation with
+    append_record and offer compact a chance to tidy the storage afterwards.
+    Used as a context manager, a backend may group the mutations made in the
+    block and write them out together on exit.
 
     Attributes:
-        file_path (str): The path to the JSON file used for storage.
+        file_path (str): The path to the storage file.
+        key (str): The attribute name that uniquely identifies an object.
+        intern_fields (Sequence[str]): Fields whose string values are interned on load.
     """
 
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, key: str, intern_fields: Sequence[str] = ()):
         """
-        Initialize the StorageManager with a path to a JSON file.
+        Initialize the storage manager with a path to its storage file.
 
         Parameters:
-            file_path (str): The path to the JSON file to be used for storage.
+            file_path (str): The path to the storage file.
+            key (str): The attribute name that uniquely identifies an object (e.g., 'isbn').
+            intern_fields (Sequence[str]): Fields whose values repeat across objects
+                                           (e.g., 'author'). Loaded values of these
+                                           fields are interned so that equal values
+                                           share a single string object.
         """
         self.file_path = file_path
+        self.key = key
+        self.intern_fields = intern_fields
+
+    def __enter__(self) -> "BaseStorageManager[T]":
+        """
+        Start a batch of mutations.
+        """
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """
+        End a batch of mutations.
+        """
+
+    def close(self) -> None:
+        """
+        Release the storage file or connection.
+        """
+
+    def load_data(self, data_type: Type[T]) -> List[T]:
+        """
+        Load the stored objects of the provided data type.
+        """
+        raise NotImplementedError
+
+    def append_record(
+        self, op: str, item: Optional[T] = None, key: Optional[str] = None
+    ) -> None:
+        """
+        Record that an object was stored (op 'add') or removed (op 'del').
+        """
+        raise NotImplementedError
+
+    def compact(self, data: List[T]) -> None:
+        """
+        Tidy the storage given the list of live objects, if it needs it.
+        """
+
+    def save_data(self, data: List[T]) -> None:
+        """
+        Replace the stored objects with a list of objects.
+        """
+        raise NotImplementedError
+
+    def _create(self, data_type: Type[T], item: Dict[str, Any]) -> T:
+        """
+        Construct an object from its stored fields, interning the repetitive ones.
+
+        Parameters:
+            data_type (Type[T]): The class of the object.
+            item (Dict[str, Any]): The stored fields of the object.
+
+        Returns:
+            T: The constructed object.
+        """
+        for field in self.intern_fields:
+            value = item.get(field)
+            if isinstance(value, str):
+                item[field] = sys.intern(value)
+        return data_type(**item)
+
+
+class StorageManager(BaseStorageManager[T]):
+    """
+    Manages the storage of data in a JSON Lines journal file.
+
+    This class is generic and can be used to manage any type of data.
+    Users must provide a data class (like Book or User) with a to_dict() method,
+    a file path for storage and the name of the attribute that uniquely
+    identifies each object.
+
+    Every mutation is appended to the file as a single record, either
+    {"op": "add", "data": {...}} or {"op": "del", "key": ...}, so a change costs
+    the size of one record instead of a rewrite of the whole file. An "add"
+    record carries a "key" too when it replaces an object stored under a
+    different key. Loading replays the journal, and the file is compacted once
+    it holds more than twice as many records as there are live objects.
+
+    Replay reproduces the order of the managers' lists: a new object is
+    appended, a replaced object keeps its position, and a deleted object's
+    position is taken by the last object.
+
+    Used as a context manager, the file is kept open for the duration of the
+    block so a burst of mutations is buffered and written out together on exit.
+
+    Attributes:
+        file_path (str): The path to the journal file used for storage.
+        key (str): The attribute name that uniquely identifies an object.
+        fsync (bool): Whether to fsync the file when a batch is written out.
+        intern_fields (Sequence[str]): Fields whose string values are interned on load.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        key: str,
+        fsync: bool = False,
+        intern_fields: Sequence[str] = (),
+    ):
+        """
+        Initialize the StorageManager with a path to a journal file.
+
+        Parameters:
+            file_path (str): The path to the journal file to be used for storage.
+            key (str): The attribute name that uniquely identifies an object (e.g., 'isbn').
+            fsync (bool): Whether to fsync the file when a batch is written out.
+                          Defaults to False.
+            intern_fields (Sequence[str]): Fields whose loaded values are interned.
+        """
+        super().__init__(file_path, key, intern_fields)
+        self.fsync = fsync
+        self._log_size = 0  # Number of records currently in the file
+        self._file: Optional[IO[bytes]] = None  # Open file while batching
+
+    def __enter__(self) -> "StorageManager[T]":
+        """
+        Start a batch: keep the journal file open until the block exits.
+        """
+        if self._file is None:
+            self._file = open(self.file_path, "ab")
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """
+        End a batch: write out the buffered records and close the file.
+        """
+        file, self._file = self._file, None
+        if file is None:
+            return
+        with file:
+            file.flush()
+            if self.fsync:
+                os.fsync(file.fileno())
+
+    def close(self) -> None:
+        """
+        Write out and close the file of an open batch, if any.
+        """
+        self.__exit__(None, None, None)
 
     def load_data(self, data_type: Type[T]) -> List[T]:
         """
-        Load data from the JSON file and return a list of objects of the provided data type.
+        Replay the journal file and return a list of objects of the provided data type.
 
         If the file is not found, returns an empty list.
-        If the file is not a valid JSON, raises a ValueError.
+        If the file is a plain JSON array (the previous storage format), it is
+        loaded and rewritten as a journal.
+        If the last line is cut off mid-record, as left by an interrupted append
+        (no trailing newline and not decodable), it is discarded and cut from the
+        file. Any other invalid record raises a ValueError and the file is left
+        untouched.
 
         Parameters:
             data_type (Type[T]): The class of the data to load (e.g., Book, User).
 
         Returns:
-            List[T]: A list of objects of the provided data type, loaded from the JSON file.
+            List[T]: A list of objects of the provided data type, loaded from the file.
         """
+        items: List[Dict[str, Any]] = []
+        positions: Dict[str, int] = {}  # Position of each key in items
+        legacy_data: Optional[List[T]] = None
+        torn_offset: Optional[int] = None  # Start of an incomplete last record
+        missing_newline = False
+        self._log_size = 0
         try:
-            with open(self.file_path, "r") as file:
-                data = json.load(file)
-                return [data_type(**item) for item in data]
+            with open(self.file_path, "rb") as file:
+                offset = 0
+                for line in file:
+                    line_offset, offset = offset, offset + len(line)
+                    if not line.strip():
+                        continue
+                    if self._log_size == 0 and line.lstrip().startswith(b"["):
+                        file.seek(0)
+                        legacy_data = self._load_array(file, data_type)
+                        break
+
+                    try:
+                        record = _loads(line)
+                    except ValueError:
+                        # Only a final line without its newline can be a torn append
+                        if line.endswith(b"\n"):
+                            raise
+                        torn_offset = line_offset
+                        break
+
+                    if record["op"] == "add":
+                        key = record.get("key", record["data"][self.key])
+                    elif record["op"] == "del":
+                        key = record["key"]
+                    else:
+                        raise ValueError("Unknown journal operation")
+
+                    index = positions.pop(key, None)
+                    if record["op"] == "add":
+                        data = record["data"]
+                        if index is None:
+                            index = len(items)
+                            items.append(data)
+                        else:
+                            items[index] = data
+                        positions[data[self.key]] = index
+                    elif index is not None:
+                        # Mirror the managers' swap-with-last removal
+                        last = items.pop()
+                        if index < len(items):
+                            items[index] = last
+                            positions[last[self.key]] = index
+                    self._log_size += 1
+                    missing_newline = not line.endswith(b"\n")
         except FileNotFoundError:
             return []  # Return an empty list if the file does not exist
-        except json.JSONDecodeError:
+        except (ValueError, KeyError, TypeError) + _IJSON_ERRORS:
             raise ValueError("File is not a valid JSON.")
 
+        # Repair the tail so the next append starts on a fresh line
+        if torn_offset is not None:
+            os.truncate(self.file_path, torn_offset)
+        elif missing_newline:
+            with open(self.file_path, "ab") as file:
+                file.write(b"\n")
+
+        if legacy_data is not None:
+            self.save_data(legacy_data)  # Migrate to the journal format
+            return legacy_data
+
+        # Only objects that survived the replay are constructed
+        return [self._create(data_type, item) for item in items]
+
+    def _load_array(self, file: IO[bytes], data_type: Type[T]) -> List[T]:
+        """
+        Load objects from a file holding a single JSON array, parsing one element
+        at a time when ijson is available.
+
+        Parameters:
+            file (IO[bytes]): The open file positioned at the start of the array.
+            data_type (Type[T]): The class of the data to load.
+
+        Returns:
+            List[T]: A list of objects of the provided data type.
+        """
+        items = ijson.items(file, "item") if ijson else _loads(file.read())
+        return [self._create(data_type, item) for item in items]
+
+    def append_record(
+        self, op: str, item: Optional[T] = None, key: Optional[str] = None
+    ) -> None:
+        """
+        Append a single record to the journal file.
+
+        Parameters:
+            op (str): 'add' to store (or replace) an object, 'del' to remove one.
+            item (Optional[T]): The object to store or remove.
+            key (Optional[str]): The key the object was stored under, if it differs
+                                 from the item's current key or no item is given.
+        """
+        if op == "add":
+            record = {"op": op, "data": item.to_dict()}
+            if key is not None and key != getattr(item, self.key):
+                record["key"] = key
+        elif op == "del":
+            if key is None:
+                key = getattr(item, self.key)
+            record = {"op": op, "key": key}
+        else:
+            raise ValueError(f"Unknown journal operation: {op}")
+
+        if self._file is not None:
+            self._file.write(_dumps(record))
+        else:
+            with open(self.file_path, "ab") as file:
+                file.write(_dumps(record))
+        self._log_size += 1
+
+    def compact(self, data: List[T]) -> None:
+        """
+        Rewrite the journal from the live objects if it has grown to more than
+        twice their number.
+
+        Parameters:
+            data (List[T]): The list of live objects.
+        """
+        if self._log_size > 2 * len(data):
+            self.save_data(data)
+
+    def save_data(self, data: List[T]) -> None:
+        """
+        Save a list of objects to the file, replacing the existing journal.
+
+        The new journal is written to a temporary file that then replaces the old
+        one, so a crash during the rewrite leaves the previous journal intact.
+
+        Parameters:
+            data (List[T]): The list of objects to be saved.
+        """
+        temp_path = self.file_path + ".tmp"
+        with open(temp_path, "wb") as file:
+            file.write(
+                b"".join(_dumps({"op": "add", "data": item.to_dict()}) for item in data)
+            )
+            if self.fsync:
+                file.flush()
+                os.fsync(file.fileno())
+
+        batching = self._file is not None
+        if batching:
+            # Buffered records are superseded by the rewrite
+            self._file.close()
+        os.replace(temp_path, self.file_path)
+        if batching:
+            self._file = open(self.file_path, "ab")
+        self._log_size = len(data)
+
+
+class SqliteStorageManager(BaseStorageManager[T]):
+    """
+    Manages the storage of data in a table of an SQLite database.
+
+    Provides the same interface as StorageManager, but each mutation is a
+    single-row INSERT, UPDATE or DELETE against a table whose primary key is the
+    object's key attribute, so no file is ever rewritten or replayed. The table
+    is created on the first write, with one column per to_dict() entry.
+
+    Rows are loaded in rowid order. A deleted row's rowid is given to the last
+    row, so the order matches the managers' swap-with-last removal.
+
+    Used as a context manager, the mutations made in the block are committed
+    as one transaction when it exits, even if it raised, so the database keeps
+    every change the managers have already applied in memory (as the journal
+    does).
+
+    A column can reference the table holding the objects with the same key
+    (e.g., checkouts.isbn references books.isbn). The foreign key is declared
+    when the table is created and the referenced table already exists in the
+    database, and it is enforced on this manager's own inserts and updates.
+    It has no actions on the referenced rows: the managers delete and re-key
+    those independently of the rows referring to them, as with the journal.
+
+    Attributes:
+        file_path (str): The path to the SQLite database file.
+        table (str): The name of the table holding the objects.
+        key (str): The attribute name that uniquely identifies an object.
+        indexes (Sequence[str]): Additional columns to create an index on.
+        references (Sequence[Tuple[str, str]]): (column, table) pairs of columns
+                                                that hold the key of another table.
+        intern_fields (Sequence[str]): Fields whose string values are interned on load.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        table: str,
+        key: str,
+        indexes: Sequence[str] = (),
+        intern_fields: Sequence[str] = (),
+        references: Sequence[Tuple[str, str]] = (),
+    ):
+        """
+        Initialize the SqliteStorageManager with a database file and table.
+
+        Parameters:
+            file_path (str): The path to the SQLite database file.
+            table (str): The name of the table holding the objects (e.g., 'books').
+            key (str): The attribute name that uniquely identifies an object (e.g., 'isbn').
+            indexes (Sequence[str]): Additional columns to index (e.g., 'user_id').
+            intern_fields (Sequence[str]): Fields whose loaded values are interned.
+            references (Sequence[Tuple[str, str]]): Columns holding the key of
+                                                    another table, paired with
+                                                    that table (e.g., ('isbn',
+                                                    'books')).
+        """
+        super().__init__(file_path, key, intern_fields)
+        self.table = table
+        self.indexes = indexes
+        self.references = references
+        self._connection = sqlite3.connect(file_path)
+        if references:
+            self._connection.execute("PRAGMA foreign_keys = ON")
+        # Close the connection when the manager is garbage collected or at exit
+        self._finalizer = weakref.finalize(self, self._connection.close)
+        self._columns: Optional[List[str]] = None  # None until the table exists
+        self._batch_depth = 0
+
+    def __enter__(self) -> "SqliteStorageManager[T]":
+        """
+        Start a batch: defer committing until the block exits.
+        """
+        self._batch_depth += 1
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """
+        End a batch: commit the mutations made in the block.
+        """
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            self._connection.commit()
+
+    def close(self) -> None:
+        """
+        Commit any pending mutations and close the database connection.
+        """
+        if self._finalizer.alive:
+            self._connection.commit()
+            self._batch_depth = 0
+            self._finalizer()
+
+    def _commit(self) -> None:
+        """
+        Commit the pending mutations unless a batch is open.
+        """
+        if self._batch_depth == 0:
+            self._connection.commit()
+
+    def _load_columns(self) -> Optional[List[str]]:
+        """
+        Return the columns of the table, or None if it does not exist yet.
+        """
+        if self._columns is None:
+            rows = self._connection.execute(
+                f'PRAGMA table_info("{self.table}")'
+            ).fetchall()
+            if rows:
+                self._columns = [row[1] for row in rows]
+        return self._columns
+
+    def _ensure_table(self, columns: List[str]) -> None:
+        """
+        Create the table and its indexes if they do not exist yet.
+        """
+        if self._load_columns() is not None:
+            return
+
+        column_defs = [
+            f'"{column}" TEXT PRIMARY KEY' if column == self.key else f'"{column}"'
+            for column in columns
+        ]
+        for column, table in self.references:
+            referenced = self._connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                (table,),
+            ).fetchone()
+            if referenced:
+                column_defs.append(
+                    f'FOREIGN KEY("{column}") REFERENCES "{table}"("{column}")'
+                )
+        self._connection.execute(
+            f'CREATE TABLE "{self.table}" ({", ".join(column_defs)})'
+        )
+        for column in self.indexes:
+            self._connection.execute(
+                f'CREATE INDEX "{self.table}_{column}" ON "{self.table}" ("{column}")'
+            )
+        self._columns = list(columns)
+
+    def _upsert_sql(self) -> str:
+        """
+        Build the statement that inserts a row or updates it on a key conflict.
+        """
+        columns = ", ".join(f'"{column}"' for column in self._columns)
+        placeholders = ", ".join("?" for _ in self._columns)
+        updates = ", ".join(
+            f'"{column}" = excluded."{column}"'
+            for column in self._columns
+            if column != self.key
+        )
+        return (
+            f'INSERT INTO "{self.table}" ({columns}) VALUES ({placeholders}) '
+            f'ON CONFLICT("{self.key}") DO UPDATE SET {updates}'
+        )
+
+    def load_data(self, data_type: Type[T]) -> List[T]:
+        """
+        Load all rows of the table and return them as objects of the provided data type.
+
+        If the table does not exist yet, returns an empty list.
+
+        Parameters:
+            data_type (Type[T]): The class of the data to load (e.g., Book, User).
+
+        Returns:
+            List[T]: A list of objects of the provided data type.
+        """
+        columns = self._load_columns()
+        if columns is None:
+            return []
+
+        select_columns = ", ".join(f'"{column}"' for column in columns)
+        rows = self._connection.execute(
+            f'SELECT {select_columns} FROM "{self.table}" ORDER BY rowid'
+        )
+        return [self._create(data_type, dict(zip(columns, row))) for row in rows]
+
+    def append_record(
+        self, op: str, item: Optional[T] = None, key: Optional[str] = None
+    ) -> None:
+        """
+        Insert, update or delete the row of a single object.
+
+        Parameters:
+            op (str): 'add' to store (or replace) an object, 'del' to remove one.
+            item (Optional[T]): The object to store or remove.
+            key (Optional[str]): The key the object was stored under, if it differs
+                                 from the item's current key or no item is given.
+        """
+        try:
+            if op == "add":
+                data = item.to_dict()
+                self._ensure_table(list(data))
+                values = [data[column] for column in self._columns]
+                if key is not None and key != data[self.key]:
+                    # Update the existing row in place so it keeps its rowid
+                    assignments = ", ".join(
+                        f'"{column}" = ?' for column in self._columns
+                    )
+                    self._connection.execute(
+                        f'UPDATE "{self.table}" SET {assignments} '
+                        f'WHERE "{self.key}" = ?',
+                        values + [key],
+                    )
+                else:
+                    self._connection.execute(self._upsert_sql(), values)
+            elif op == "del":
+                if key is None:
+                    key = getattr(item, self.key)
+                if self._load_columns() is not None:
+                    row = self._connection.execute(
+                        f'SELECT rowid FROM "{self.table}" WHERE "{self.key}" = ?',
+                        (key,),
+                    ).fetchone()
+                    if row is not None:
+                        self._connection.execute(
+                            f'DELETE FROM "{self.table}" WHERE rowid = ?', row
+                        )
+                        # Move the last row into the freed rowid
+                        self._connection.execute(
+                            f'UPDATE "{self.table}" SET rowid = ? '
+                            f'WHERE rowid = (SELECT MAX(rowid) FROM "{self.table}") '
+                            f"AND rowid > ?",
+                            row * 2,
+                        )
+            else:
+                raise ValueError(f"Unknown journal operation: {op}")
+        finally:
+            # A failed statement must not leave the write lock held
+            self._commit()
+
+    def compact(self, data: List[T]) -> None:
+        """
+        Does nothing: rows are updated in place, so there is no journal to compact.
+
+        Parameters:
+            data (List[T]): The list of live objects.
+        """
+
     def save_data(self, data: List[T]) -> None:
         """
-        Save a list of objects to the JSON file.
+        Replace the contents of the table with a list of objects.
 
         Parameters:
             data (List[T]): The list of objects to be saved.
         """
-        with open(self.file_path, "w") as file:
-            json.dump([item.__dict__ for item in data], file, indent=4)
+        rows = [item.to_dict() for item in data]
+        if rows:
+            self._ensure_table(list(rows[0]))
+        if self._load_columns() is not None:
+            self._connection.execute(f'DELETE FROM "{self.table}"')
+            self._connection.executemany(
+                self._upsert_sql(),
+                ([row[column] for column in self._columns] for row in rows),
+            )
+        self._commit()
+
+
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+
+def create_storage_manager(
+    file_path: str,
+    table: str,
+    key: str,
+    indexes: Sequence[str] = (),
+    intern_fields: Sequence[str] = (),
+    references: Sequence[Tuple[str, str]] = (),
+) -> BaseStorageManager[Any]:
+    """
+    Create the storage manager matching a file path: an SqliteStorageManager for
+    SQLite database files (.db, .sqlite, .sqlite3) and a StorageManager otherwise.
+
+    Parameters:
+        file_path (str): The path to the storage file.
+        table (str): The table to use if the file is an SQLite database.
+        key (str): The attribute name that uniquely identifies an object.
+        indexes (Sequence[str]): Additional columns to index in an SQLite database.
+        intern_fields (Sequence[str]): Fields whose loaded values are interned.
+        references (Sequence[Tuple[str, str]]): Columns holding the key of another
+                                                table in an SQLite database.
+
+    Returns:
+        BaseStorageManager[Any]: The storage manager for the file.
+    """
+    if file_path.endswith(SQLITE_EXTENSIONS):
+        return SqliteStorageManager(
+            file_path, table, key, indexes, intern_fields, references
+        )
+    return StorageManager(file_path, key, intern_fields=intern_fields)
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+from typing import List
+
+from book import BookManager
+from check import CheckoutManager
+
+
+class CheckoutManagerTest(unittest.TestCase):
+    """
+    Tests for the checkout limit and the per-user checkout index.
+    """
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.books = BookManager(os.path.join(self.directory.name, "books.json"))
+        for isbn in "ABCDE":
+            self.books.add_book(f"Title {isbn}", "Author", isbn)
+        self.manager = self.load_manager()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def load_manager(self) -> CheckoutManager:
+        return CheckoutManager(
+            os.path.join(self.directory.name, "checkouts.json"), self.books
+        )
+
+    def listed_isbns(self, manager: CheckoutManager, user_id: str) -> List[str]:
+        return [checkout.isbn for checkout in manager.list_user_checkouts(user_id)]
+
+    def test_checkout_limit_is_three_books(self) -> None:
+        for isbn in "ABC":
+            self.assertTrue(self.manager.checkout_book("u1", isbn))
+
+        self.assertFalse(self.manager.checkout_book("u1", "D"))
+        self.assertTrue(self.books.find_book_by_isbn("D").available)
+        self.assertTrue(self.manager.checkout_book("u2", "D"))
+
+    def test_checkin_frees_a_slot(self) -> None:
+        for isbn in "ABC":
+            self.manager.checkout_book("u1", isbn)
+
+        self.assertTrue(self.manager.checkin_book("B"))
+        self.assertTrue(self.books.find_book_by_isbn("B").available)
+        self.assertTrue(self.manager.checkout_book("u1", "D"))
+        self.assertFalse(self.manager.checkout_book("u1", "E"))
+
+    def test_list_user_checkouts_follows_list_order(self) -> None:
+        self.manager.checkout_book("u2", "A")
+        for isbn in "BCD":
+            self.manager.checkout_book("u1", isbn)
+        self.manager.checkin_book("A")
+        self.manager.checkin_book("C")
+
+        expected = [
+            checkout.isbn
+            for checkout in self.manager.checkouts
+            if checkout.user_id == "u1"
+        ]
+        self.assertEqual(self.listed_isbns(self.manager, "u1"), expected)
+        self.assertEqual(self.listed_isbns(self.load_manager(), "u1"), expected)
+
+    def test_emptied_user_entry_is_removed(self) -> None:
+        self.manager.checkout_book("u1", "A")
+        self.manager.checkout_book("u1", "B")
+        self.manager.checkin_book("A")
+        self.manager.checkin_book("B")
+
+        self.assertNotIn("u1", self.manager._by_user)
+        self.assertEqual(self.manager.list_user_checkouts("u1"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
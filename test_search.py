@@ -0,0 +1,159 @@
+import os
+import random
+import tempfile
+import unittest
+from typing import List
+
+from book import BookManager
+from search import QGramIndex, SubstringColumn
+from user import UserManager
+
+# Mixed case and non-ASCII letters whose lowercase forms differ in length or
+# depend on context ("İ" lowercases to two code points, "Σ" to "σ")
+ALPHABET = "abAB ßİiΣσςéÉ1-"
+
+
+class SearchOrderTest(unittest.TestCase):
+    """
+    Tests that indexed searches return results in list order.
+    """
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_find_book_keeps_list_order_after_update(self) -> None:
+        manager = BookManager(os.path.join(self.directory.name, "books.json"))
+        for isbn in "012":
+            manager.add_book(f"alpha {isbn}", "Author", isbn)
+        manager.update_book("0", new_title="alpha zero")
+
+        self.assertEqual(
+            [book.isbn for book in manager.find_book("alpha")], ["0", "1", "2"]
+        )
+
+    def test_find_user_keeps_list_order_after_update(self) -> None:
+        manager = UserManager(os.path.join(self.directory.name, "users.json"))
+        for user_id in "012":
+            manager.add_user(f"alpha {user_id}", user_id)
+        manager.update_user("0", new_name="alpha zero")
+
+        self.assertEqual(
+            [user.user_id for user in manager.find_user("alpha")], ["0", "1", "2"]
+        )
+
+
+class SearchMatchesScanTest(unittest.TestCase):
+    """
+    Tests that indexed and column searches match a naive scan of the records.
+    """
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.random = random.Random(1227)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def random_text(self, max_length: int = 8) -> str:
+        length = self.random.randint(1, max_length)
+        return "".join(self.random.choice(ALPHABET) for _ in range(length))
+
+    def search_terms(self, values: List[str]) -> List[str]:
+        terms = [self.random_text(4) for _ in range(30)]
+        for value in values:
+            start = self.random.randrange(len(value))
+            for length in (1, 2, 3, 5):
+                terms.append(value[start : start + length])
+            terms.append(value.upper())
+        return terms
+
+    def check_books(self, manager: BookManager) -> None:
+        values = [
+            value for book in manager.books for value in (book.title, book.isbn)
+        ]
+        for term in self.search_terms(values):
+            expected = [
+                book.isbn
+                for book in manager.books
+                if term.lower() in book.title.lower()
+                or term.lower() in book.author.lower()
+                or term in book.isbn
+            ]
+            found = [book.isbn for book in manager.find_book(term)]
+            self.assertEqual(found, expected, term)
+
+    def check_users(self, manager: UserManager) -> None:
+        values = [
+            value for user in manager.users for value in (user.name, user.user_id)
+        ]
+        for term in self.search_terms(values):
+            expected = [
+                user.user_id
+                for user in manager.users
+                if term.lower() in user.name.lower() or term in user.user_id
+            ]
+            found = [user.user_id for user in manager.find_user(term)]
+            self.assertEqual(found, expected, term)
+
+    def test_find_book_matches_scan(self) -> None:
+        manager = BookManager(os.path.join(self.directory.name, "books.json"))
+        for number in range(40):
+            manager.add_book(self.random_text(), self.random_text(), f"{number}-x")
+        self.check_books(manager)
+
+        for number in range(0, 40, 3):
+            manager.update_book(f"{number}-x", new_title=self.random_text())
+        for number in range(1, 40, 5):
+            manager.delete_book(f"{number}-x")
+        for number in range(2, 40, 4):
+            new_isbn = f"{number}-Y{self.random_text(3)}"
+            manager.update_book(f"{number}-x", new_isbn=new_isbn)
+        self.check_books(manager)
+
+    def test_find_user_matches_scan(self) -> None:
+        manager = UserManager(os.path.join(self.directory.name, "users.json"))
+        for number in range(40):
+            manager.add_user(self.random_text(), f"{number}-u")
+        self.check_users(manager)
+
+        for number in range(0, 40, 3):
+            manager.update_user(f"{number}-u", new_name=self.random_text())
+        for number in range(1, 40, 5):
+            manager.delete_user(f"{number}-u")
+        for number in range(2, 40, 4):
+            manager.update_user(f"{number}-u", new_user_id=f"{number}-V")
+        self.check_users(manager)
+
+    def test_qgram_candidates_include_every_match(self) -> None:
+        index: QGramIndex[int] = QGramIndex()
+        values = [self.random_text() for _ in range(50)]
+        for number, value in enumerate(values):
+            index.add(number, value)
+        for number in range(0, 50, 4):
+            index.discard(number)
+
+        for term in self.search_terms(values):
+            candidates = index.candidates(term)
+            if len(term.lower()) < index.q:
+                self.assertIsNone(candidates, term)
+                continue
+            expected = {
+                number
+                for number, value in enumerate(values)
+                if number % 4 and term.lower() in value.lower()
+            }
+            self.assertLessEqual(expected, set(candidates), term)
+
+    def test_substring_column_matches_scan(self) -> None:
+        values = [self.random_text() for _ in range(50)] + [""]
+        column = SubstringColumn(values)
+        for term in self.search_terms([value for value in values if value]):
+            expected = [number for number, value in enumerate(values) if term in value]
+            self.assertEqual(list(column.find(term)), expected, term)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,281 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from book import Book, BookManager
+from check import CheckoutManager, CheckoutRecord
+from main import LibrarySystemUI
+from storage import StorageManager
+from user import UserManager
+
+
+class StorageManagerTest(unittest.TestCase):
+    """
+    Tests for the JSON Lines journal kept by StorageManager.
+    """
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "books.json")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def read_records(self) -> list:
+        with open(self.path, "rb") as file:
+            return [json.loads(line) for line in file]
+
+    def load_isbns(self) -> list:
+        return [book.isbn for book in BookManager(self.path).books]
+
+    def test_missing_file_loads_empty(self) -> None:
+        self.assertEqual(StorageManager(self.path, key="isbn").load_data(Book), [])
+
+    def test_replay_applies_adds_updates_and_deletes(self) -> None:
+        manager = BookManager(self.path)
+        manager.add_book("Dune", "Herbert", "1")
+        manager.add_book("Emma", "Austen", "2")
+        manager.update_book("1", new_title="Dune Messiah")
+        manager.delete_book("2")
+
+        books = BookManager(self.path).books
+        self.assertEqual(
+            [(book.title, book.isbn) for book in books], [("Dune Messiah", "1")]
+        )
+
+    def test_isbn_change_replaces_record_under_old_key(self) -> None:
+        manager = BookManager(self.path)
+        manager.add_book("Dune", "Herbert", "1")
+        manager.add_book("Emma", "Austen", "2")
+        manager.update_book("1", new_isbn="9")
+
+        ops = [(record["op"], record.get("key")) for record in self.read_records()]
+        self.assertEqual(ops[2:], [("add", "1")])
+        self.assertEqual(self.load_isbns(), ["9", "2"])
+
+    def test_update_with_resolved_book(self) -> None:
+        manager = BookManager(self.path)
+        manager.add_book("Dune", "Herbert", "1")
+        manager.add_book("Emma", "Austen", "2")
+        book = manager.find_book_by_isbn("2")
+
+        self.assertTrue(manager.update_book(book, new_isbn="9"))
+        self.assertEqual(manager.find_book_by_isbn("9").title, "Emma")
+        self.assertEqual(manager.find_book_by_isbn("1").title, "Dune")
+        self.assertEqual(self.load_isbns(), ["1", "9"])
+
+    def test_update_with_deleted_or_stale_book_fails(self) -> None:
+        manager = BookManager(self.path)
+        manager.add_book("Dune", "Herbert", "1")
+        deleted = manager.find_book_by_isbn("1")
+        manager.delete_book("1")
+        self.assertFalse(manager.update_book(deleted, new_title="Emma"))
+
+        manager.add_book("Dune", "Herbert", "1")
+        stale = BookManager(self.path).find_book_by_isbn("1")
+        self.assertFalse(manager.update_book(stale, new_title="Emma"))
+        self.assertEqual(self.load_isbns(), ["1"])
+        self.assertEqual(manager.find_book_by_isbn("1").title, "Dune")
+
+    def test_compaction_rewrites_live_records(self) -> None:
+        manager = BookManager(self.path)
+        manager.add_book("Dune", "Herbert", "1")
+        for number in range(10):
+            manager.update_book("1", new_title=f"Dune {number}")
+
+        records = self.read_records()
+        self.assertLessEqual(len(records), 2)
+        self.assertEqual(records[-1]["data"]["title"], "Dune 9")
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+
+    def test_legacy_array_is_migrated(self) -> None:
+        with open(self.path, "w") as file:
+            record = {"title": "Dune", "author": "Herbert", "isbn": "1"}
+            json.dump([dict(record, available=False)], file, indent=4)
+
+        books = BookManager(self.path).books
+        self.assertEqual(
+            [(book.isbn, book.available) for book in books], [("1", False)]
+        )
+        self.assertEqual(self.read_records()[0]["op"], "add")
+
+    def test_torn_last_record_is_discarded(self) -> None:
+        manager = BookManager(self.path)
+        manager.add_book("Dune", "Herbert", "1")
+        with open(self.path, "ab") as file:
+            file.write(b'{"op":"add","data":{"ti')
+
+        self.assertEqual(self.load_isbns(), ["1"])
+
+        # The torn record is cut off, so later appends stay readable
+        BookManager(self.path).add_book("Emma", "Austen", "2")
+        self.assertEqual(self.load_isbns(), ["1", "2"])
+
+    def test_last_record_without_newline_is_kept(self) -> None:
+        BookManager(self.path).add_book("Dune", "Herbert", "1")
+        with open(self.path, "rb+") as file:
+            file.truncate(os.path.getsize(self.path) - 1)
+
+        BookManager(self.path).add_book("Emma", "Austen", "2")
+        self.assertEqual(self.load_isbns(), ["1", "2"])
+
+    def test_corruption_before_the_end_raises(self) -> None:
+        manager = BookManager(self.path)
+        manager.add_book("Dune", "Herbert", "1")
+        with open(self.path, "ab") as file:
+            file.write(b"not json\n")
+        manager.add_book("Emma", "Austen", "2")
+
+        with self.assertRaises(ValueError):
+            BookManager(self.path)
+
+    def check_invalid_last_record_raises(self, line: bytes) -> None:
+        BookManager(self.path).add_book("Dune", "Herbert", "1")
+        with open(self.path, "ab") as file:
+            file.write(line)
+        with open(self.path, "rb") as file:
+            content = file.read()
+
+        with self.assertRaises(ValueError):
+            BookManager(self.path)
+        with open(self.path, "rb") as file:
+            self.assertEqual(file.read(), content)
+
+    def test_complete_record_with_unknown_op_raises(self) -> None:
+        self.check_invalid_last_record_raises(b'{"op":"upd","key":"1"}\n')
+
+    def test_complete_record_without_key_field_raises(self) -> None:
+        self.check_invalid_last_record_raises(b'{"op":"add","data":{"title":"x"}}\n')
+
+    def test_complete_undecodable_last_line_raises(self) -> None:
+        self.check_invalid_last_record_raises(b'{"op":"add","data":{"ti\n')
+
+    def test_batch_writes_records_on_exit(self) -> None:
+        manager = BookManager(self.path)
+        added = manager.bulk_add([("Dune", "Herbert", "1"), ("Emma", "Austen", "2")])
+
+        self.assertEqual(added, 2)
+        self.assertEqual(self.load_isbns(), ["1", "2"])
+
+
+class ReplayOrderTest(unittest.TestCase):
+    """
+    Tests that reloading yields the same order as the managers' lists.
+    """
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def check_order_survives_reload(self, file_name: str) -> None:
+        path = os.path.join(self.directory.name, file_name)
+        books = BookManager(path)
+        for isbn in "ABCDE":
+            books.add_book(f"Title {isbn}", "Author", isbn)
+        books.delete_book("B")
+        books.update_book("C", new_isbn="F")
+        books.add_book("Title G", "Author", "G")
+        books.delete_book("G")
+        books.delete_book("A")
+
+        users_path = path.replace("books", "users")
+        users = UserManager(users_path)
+        for user_id in "abcd":
+            users.add_user(f"Name {user_id}", user_id)
+        users.delete_user("a")
+        users.update_user("c", new_user_id="e")
+
+        self.assertEqual(
+            [book.isbn for book in BookManager(path).books],
+            [book.isbn for book in books.books],
+        )
+        self.assertEqual(
+            [user.user_id for user in UserManager(users_path).users],
+            [user.user_id for user in users.users],
+        )
+
+    def test_journal_order_survives_reload(self) -> None:
+        self.check_order_survives_reload("books.json")
+
+    def test_sqlite_order_survives_reload(self) -> None:
+        self.check_order_survives_reload("books.db")
+
+
+class SqliteStorageManagerTest(unittest.TestCase):
+    """
+    Tests for the SQLite storage backend.
+    """
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "library.db")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_failed_batch_keeps_changes_made_before_the_error(self) -> None:
+        manager = BookManager(self.path)
+        with self.assertRaises(ValueError):
+            manager.bulk_add([("Dune", "Herbert", "1"), ("Emma", "Austen")])
+        manager.close()
+
+        self.assertEqual([book.isbn for book in manager.books], ["1"])
+        self.assertEqual([book.isbn for book in BookManager(self.path).books], ["1"])
+
+    def test_managers_share_a_database(self) -> None:
+        books = BookManager(self.path)
+        users = UserManager(self.path)
+        checkouts = CheckoutManager(self.path, books)
+        books.add_book("Dune", "Herbert", "1")
+        users.add_user("Ada", "u1")
+        checkouts.checkout_book("u1", "1")
+        for manager in (checkouts, users, books):
+            manager.close()
+
+        books = BookManager(self.path)
+        checkouts = CheckoutManager(self.path, books)
+        self.assertFalse(books.find_book_by_isbn("1").available)
+        users = UserManager(self.path)
+        self.assertEqual([user.user_id for user in users.users], ["u1"])
+        self.assertEqual(
+            [record.isbn for record in checkouts.list_user_checkouts("u1")], ["1"]
+        )
+        for manager in (checkouts, users, books):
+            manager.close()
+
+    def test_checkouts_reference_books(self) -> None:
+        books = BookManager(self.path)
+        checkouts = CheckoutManager(self.path, books)
+        books.add_book("Dune", "Herbert", "1")
+        self.assertTrue(checkouts.checkout_book("u1", "1"))
+
+        with self.assertRaises(sqlite3.IntegrityError):
+            checkouts.storage_manager.append_record("add", CheckoutRecord("u1", "9"))
+        # Books are still deleted and re-keyed independently of their checkouts
+        books.add_book("Emma", "Austen", "2")
+        checkouts.checkout_book("u1", "2")
+        self.assertTrue(books.update_book("1", new_isbn="3"))
+        self.assertTrue(books.delete_book("2"))
+        for manager in (checkouts, books):
+            manager.close()
+
+    def test_checkouts_without_a_books_table_have_no_reference(self) -> None:
+        books = BookManager(os.path.join(self.directory.name, "books.json"))
+        checkouts = CheckoutManager(self.path, books)
+        books.add_book("Dune", "Herbert", "1")
+
+        self.assertTrue(checkouts.checkout_book("u1", "1"))
+        checkouts.close()
+
+    def test_shared_database_must_be_sqlite(self) -> None:
+        with self.assertRaises(ValueError):
+            LibrarySystemUI(os.path.join(self.directory.name, "library.json"))
+        LibrarySystemUI(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
-from typing import List, Optional
-from storage import StorageManager
+from typing import Dict, List, Optional
+from search import QGramIndex
+from storage import BaseStorageManager, create_storage_manager
 
 
 class User:
@@ -11,6 +12,8 @@ class User:
         user_id (str): The unique identifier for the user.
     """
 
+    __slots__ = ("name", "user_id")
+
     def __init__(self, name: str, user_id: str) -> None:
         """
         Initializes a User with a name and user ID.
@@ -24,6 +27,12 @@ class User:
         """
         return f"User: {self.name}, ID: {self.user_id}"
 
+    def to_dict(self) -> Dict[str, str]:
+        """
+        Dictionary representation of the User, used for storage.
+        """
+        return {"name": self.name, "user_id": self.user_id}
+
 
 class UserManager:
     """
@@ -37,8 +46,18 @@ class UserManager:
         """
         Initializes the UserManager with an empty list of users.
         """
-        self.storage_manager = StorageManager[User](file_path)
+        self.storage_manager: BaseStorageManager[User] = create_storage_manager(
+            file_path, table="users", key="user_id"
+        )
         self.users = self.storage_manager.load_data(User)
+        self._by_user_id: Dict[str, User] = {user.user_id: user for user in self.users}
+        # Position of each user in self.users, for O(1) removal
+        self._index_by_user_id: Dict[str, int] = {
+            user.user_id: index for index, user in enumerate(self.users)
+        }
+        self._search_index = QGramIndex[User]()
+        for user in self.users:
+            self._search_index.add(user, user.name, user.user_id)
 
     @property
     def all_users(self) -> List[User]:
@@ -53,23 +72,33 @@ class UserManager:
 
         Ensures that the user ID is unique.
         """
-        if any(user.user_id == user_id for user in self.users):
+        if user_id in self._by_user_id:
             return False  # User ID already exists
 
-        self.users.append(User(name, user_id))
-        self.storage_manager.save_data(self.users)  # Save after adding
+        new_user = User(name, user_id)
+        self._index_by_user_id[user_id] = len(self.users)
+        self.users.append(new_user)
+        self._by_user_id[user_id] = new_user
+        self._search_index.add(new_user, name, user_id)
+        self.storage_manager.append_record("add", new_user)  # Save after adding
         return True
 
     def delete_user(self, user_id: str) -> bool:
         """
         Deletes a user identified by user ID.
         """
-        user_to_delete = next(
-            (user for user in self.users if user.user_id == user_id), None
-        )
+        user_to_delete = self._by_user_id.pop(user_id, None)
         if user_to_delete:
-            self.users.remove(user_to_delete)
-            self.storage_manager.save_data(self.users)  # Save after deleting
+            # Move the last user into the freed slot instead of shifting the list
+            index = self._index_by_user_id.pop(user_id)
+            last_user = self.users.pop()
+            if index < len(self.users):
+                self.users[index] = last_user
+                self._index_by_user_id[last_user.user_id] = index
+            self._search_index.discard(user_to_delete)
+            # Save after deleting
+            self.storage_manager.append_record("del", user_to_delete)
+            self.storage_manager.compact(self.users)
             return True
         return False
 
@@ -82,25 +111,37 @@ class UserManager:
         """
         Updates the attributes of a user identified by user ID.
         """
-        user_to_update = next(
-            (user for user in self.users if user.user_id == user_id), None
-        )
+        user_to_update = self._by_user_id.get(user_id)
         if user_to_update:
-            if new_name:
-                user_to_update.name = new_name
-            if new_user_id:
-                if any(
-                    user.user_id == new_user_id
-                    for user in self.users
-                    if user != user_to_update
-                ):
+            if new_user_id and new_user_id != user_id:
+                if new_user_id in self._by_user_id:
                     return False
+                del self._by_user_id[user_id]
                 user_to_update.user_id = new_user_id
+                self._by_user_id[new_user_id] = user_to_update
+                self._index_by_user_id[new_user_id] = self._index_by_user_id.pop(
+                    user_id
+                )
+            if new_name:
+                user_to_update.name = new_name
 
-            self.storage_manager.save_data(self.users)  # Save after updating
+            self._search_index.discard(user_to_update)
+            self._search_index.add(
+                user_to_update, user_to_update.name, user_to_update.user_id
+            )
+
+            # Save after updating
+            self.storage_manager.append_record("add", user_to_update, key=user_id)
+            self.storage_manager.compact(self.users)
             return True
         return False
 
+    def close(self) -> None:
+        """
+        Releases the storage file or database connection.
+        """
+        self.storage_manager.close()
+
     def list_users(self) -> List[User]:
         """
         Returns a list of all users.
@@ -111,9 +152,17 @@ class UserManager:
         """
         Finds users that match the search term in name or user ID.
         """
+        # Short terms cannot be narrowed by the index and fall back to a full scan
+        candidates = self._search_index.candidates(search_term)
+        if candidates is None:
+            candidates = self.users
+        else:
+            # Postings follow insertion order, so restore the list order
+            candidates.sort(key=lambda user: self._index_by_user_id[user.user_id])
+
         found_users = []
         search_term_lower = search_term.lower()
-        for user in self.users:
+        for user in candidates:
             if search_term_lower in user.name.lower() or search_term in user.user_id:
                 found_users.append(user)
         return found_users